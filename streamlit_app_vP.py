@@ -3,9 +3,13 @@ import streamlit as st
 import sqlite3
 import os
 import json
-import pandas as pd
+import calendar
+import glob
+import pickle
 import random
-from datetime import datetime, date
+import threading
+from contextlib import contextmanager
+from datetime import date, timedelta
 #from streamlit_autorefresh import st_autorefresh
 import warnings
 
@@ -20,14 +24,49 @@ st.set_option('client.showErrorDetails', False)
 DB_PATH = 'data/chat_vP.db'
 QUESTIONS_FILE = 'questions_list.xlsx'
 MAPPING_FILE = 'data/date_questions_vP.json'
+QUESTIONS_CACHE_FILE = 'data/questions_list.{mtime}.cache.pkl'
 USER_A = 'User 1'
 USER_B = 'User 2'
 
-def init_db():
-    """Initialize the SQLite database and create the messages table if it doesn't exist."""
-    if not os.path.exists('data'):
-        os.makedirs('data')
-    conn = sqlite3.connect(DB_PATH)
+# HTML templates and styles for the question of the day and the chat bubbles
+CHAT_CSS = """
+<style>
+/* !important so Streamlit's own heading styles don't override the question text */
+.qotd { font-size: 35px !important; color: #A7FFFF !important; }
+.bubble { text-align: left; padding: 10px; border-radius: 10px; margin: 5px;
+          display: inline-block; max-width: 100%; }
+.bubble p { font-size: 18px; margin: 0; }
+.bubble-own { background-color: #8E4700; }
+.bubble-other { background-color: #439028; }
+</style>
+"""
+QOTD_TEMPLATE = "<div><h1 class='qotd'>Question of the Day:</h1><p class='qotd'>{q}</p></div>"
+# The outer divs keep each inline-block bubble on its own line once batched
+OWN_BUBBLE_TMPL = "<div><div class='bubble bubble-own'><p>You : {content}</p></div></div>"
+OTHER_BUBBLE_TMPL = "<div><div class='bubble bubble-other'><p>{sender} : {content}</p></div></div>"
+
+# Resolve the rerun function once; experimental_rerun was removed in newer Streamlit releases
+RERUN = getattr(st, 'rerun', getattr(st, 'experimental_rerun', None))
+
+def flash(kind, text):
+    """
+    Queue a success/error message to show at the top of the next run.
+    Messages shown right before a rerun would otherwise be discarded immediately.
+    """
+    st.session_state.flash_message = (kind, text)
+
+def show_flash():
+    """Show and clear the message queued by flash(), if any."""
+    queued = st.session_state.pop("flash_message", None)
+    if queued:
+        kind, text = queued
+        getattr(st, kind)(text)
+
+def init_db(conn):
+    """
+    Create the messages table and its indexes if they don't exist.
+    Called once when the shared connection is created, not on every rerun.
+    """
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS messages (
@@ -37,12 +76,54 @@ def init_db():
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    conn.commit()
-    conn.close()
+    # Index on the raw timestamp so the per-date range lookup in get_messages can seek instead of scanning
+    c.execute("CREATE INDEX IF NOT EXISTS idx_ts ON messages(timestamp, id)")
+
+def apply_pragmas(conn):
+    """Tune the connection for frequent small writes (WAL journal, relaxed fsync, in-memory temp storage)."""
+    c = conn.cursor()
+    c.execute("PRAGMA journal_mode=WAL;")
+    c.execute("PRAGMA synchronous=NORMAL;")
+    c.execute("PRAGMA busy_timeout=5000;")
+    c.execute("PRAGMA temp_store=MEMORY;")
+    c.execute("PRAGMA cache_size=-20000;")
 
+@st.cache_resource
 def get_connection():
-    """Establish a connection to the SQLite database."""
-    return sqlite3.connect(DB_PATH, check_same_thread=False)
+    """
+    Establish a single long-lived connection to the SQLite database.
+    The connection is cached across reruns and sessions, so it must not be closed by callers.
+    """
+    if not os.path.exists('data'):
+        os.makedirs('data')
+    conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+    apply_pragmas(conn)
+    init_db(conn)
+    return conn
+
+@st.cache_resource
+def get_write_lock():
+    """Lock serializing use of the shared connection: writes, and reads so they never see uncommitted rows."""
+    return threading.Lock()
+
+@contextmanager
+def write_transaction():
+    """
+    Run a block of writes on the shared connection as one transaction.
+    Commits when the block succeeds and rolls back if it raises. The connection is in
+    autocommit mode (isolation_level=None), so 'with conn:' alone would not open a transaction.
+    """
+    conn = get_connection()
+    with get_write_lock():
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            # Also covers a failed COMMIT, which would otherwise leave the shared connection mid-transaction
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
 
 def send_message(sender, message, chat_date_str=None):
     """
@@ -50,16 +131,21 @@ def send_message(sender, message, chat_date_str=None):
     If chat_date_str is provided, use it as the timestamp (with time set to 00:00:00)
     so that the message is recorded for that specific day.
     """
-    conn = get_connection()
-    c = conn.cursor()
-    if chat_date_str:
-        timestamp_value = f"{chat_date_str} 00:00:00"
-        c.execute("INSERT INTO messages (sender, message, timestamp) VALUES (?, ?, ?)",
-                  (sender, message, timestamp_value))
-    else:
-        c.execute("INSERT INTO messages (sender, message) VALUES (?, ?)", (sender, message))
-    conn.commit()
-    conn.close()
+    with write_transaction() as conn:
+        if chat_date_str:
+            timestamp_value = f"{chat_date_str} 00:00:00"
+            conn.execute("INSERT INTO messages (sender, message, timestamp) VALUES (?, ?, ?)",
+                         (sender, message, timestamp_value))
+        else:
+            conn.execute("INSERT INTO messages (sender, message) VALUES (?, ?)", (sender, message))
+
+def send_messages_bulk(rows):
+    """
+    Insert many messages at once, e.g. for imports or backfills.
+    rows is an iterable of (sender, message, timestamp) tuples; all rows are written in a single transaction.
+    """
+    with write_transaction() as conn:
+        conn.executemany("INSERT INTO messages (sender, message, timestamp) VALUES (?, ?, ?)", rows)
 
 def get_messages(selected_date=None):
     """
@@ -67,72 +153,91 @@ def get_messages(selected_date=None):
     If selected_date is provided, filter messages for that specific date.
     """
     conn = get_connection()
-    c = conn.cursor()
-    if selected_date:
-        # Filter messages by the selected date
-        c.execute("""
-            SELECT id, sender, message, timestamp 
-            FROM messages 
-            WHERE DATE(timestamp) = ?
-            ORDER BY id ASC
-        """, (selected_date,))
-    else:
-        # Retrieve all messages
-        c.execute("""
-            SELECT id, sender, message, timestamp 
-            FROM messages 
-            ORDER BY id ASC
-        """)
-    rows = c.fetchall()
-    conn.close()
+    # Hold the write lock so the read never runs inside another session's open transaction
+    with get_write_lock():
+        c = conn.cursor()
+        if selected_date:
+            # Filter messages by the selected date as a timestamp range, so no per-row DATE() call is needed
+            next_day = (date.fromisoformat(selected_date) + timedelta(days=1)).isoformat()
+            c.execute("""
+                SELECT id, sender, message, timestamp 
+                FROM messages 
+                WHERE timestamp >= ? AND timestamp < ?
+                ORDER BY id ASC
+            """, (f"{selected_date} 00:00:00", f"{next_day} 00:00:00"))
+        else:
+            # Retrieve all messages
+            c.execute("""
+                SELECT id, sender, message, timestamp 
+                FROM messages 
+                ORDER BY id ASC
+            """)
+        rows = c.fetchall()
     return rows
 
 def delete_message(message_id, username):
     """Delete a message by its ID if it was sent by the current user."""
-    conn = get_connection()
-    c = conn.cursor()
-    # Verify that the message was sent by the current user
-    c.execute("SELECT sender FROM messages WHERE id = ?", (message_id,))
-    result = c.fetchone()
-    if result and result[0] == username:
-        c.execute("DELETE FROM messages WHERE id = ?", (message_id,))
-        conn.commit()
-        conn.close()
-        st.success("Message deleted successfully!")
+    with write_transaction() as conn:
+        # Only rows sent by the current user match, so ownership is checked by the DELETE itself
+        c = conn.execute("DELETE FROM messages WHERE id = ? AND sender = ?", (message_id, username))
+    if c.rowcount > 0:
+        flash("success", "Message deleted successfully!")
     else:
-        conn.close()
-        st.error("You can only delete your own messages.")
+        flash("error", "You can only delete your own messages.")
 
 def edit_message(message_id, username, new_message):
     """Update a message by its ID if it was sent by the current user."""
-    conn = get_connection()
-    c = conn.cursor()
-    # Verify that the message was sent by the current user
-    c.execute("SELECT sender FROM messages WHERE id = ?", (message_id,))
-    result = c.fetchone()
-    if result and result[0] == username:
-        c.execute("UPDATE messages SET message = ? WHERE id = ?", (new_message, message_id))
-        conn.commit()
-        conn.close()
-        st.success("Message updated successfully!")
+    with write_transaction() as conn:
+        # Only rows sent by the current user match, so ownership is checked by the UPDATE itself
+        c = conn.execute("UPDATE messages SET message = ? WHERE id = ? AND sender = ?",
+                         (new_message, message_id, username))
+    if c.rowcount > 0:
+        flash("success", "Message updated successfully!")
     else:
-        conn.close()
-        st.error("You can only edit your own messages.")
+        flash("error", "You can only edit your own messages.")
+
+@st.cache_data(show_spinner=False)
+def load_questions(mtime):
+    """
+    Load the questions from all sheets of the Excel file.
+    The parsed list is also pickled to a sidecar file named after the Excel file's mtime,
+    so the workbook is only parsed again when it changes.
+    """
+    cache_file = QUESTIONS_CACHE_FILE.format(mtime=int(mtime))
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'rb') as f:
+                return pickle.load(f)
+        except Exception:
+            pass  # Unreadable cache; fall back to parsing the workbook and rewrite it
+
+    # pandas is only needed to parse the workbook, so it is imported lazily to keep startup light
+    import pandas as pd
+
+    # Assuming questions are in the first column, so only that column is read
+    sheets = pd.read_excel(QUESTIONS_FILE, sheet_name=None, engine='calamine', usecols=[0])
+    all_questions = [q for df in sheets.values() for q in df.iloc[:, 0].dropna().tolist()]
+
+    # Drop caches left over from older versions of the Excel file
+    for stale_file in glob.glob(QUESTIONS_CACHE_FILE.format(mtime='*')):
+        os.remove(stale_file)
+    # Write to a temporary file first so a partial write never leaves a corrupt cache behind
+    tmp_file = f"{cache_file}.tmp"
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(all_questions, f)
+    os.replace(tmp_file, cache_file)
+    return all_questions
 
 def load_and_assign_questions():
     """
     Load questions from the Excel file, shuffle them, and assign one question per day.
     Save the mapping to a JSON file for persistence.
     """
+    if not os.path.exists('data'):
+        os.makedirs('data')
     # Load all questions from all sheets
     try:
-        xl = pd.ExcelFile(QUESTIONS_FILE)
-        all_questions = []
-        for sheet in xl.sheet_names:
-            df = xl.parse(sheet)
-            # Assuming questions are in the first column
-            questions = df.iloc[:, 0].dropna().tolist()
-            all_questions.extend(questions)
+        all_questions = list(load_questions(os.path.getmtime(QUESTIONS_FILE)))
     except Exception as e:
         st.error(f"Error reading Excel file: {e}")
         return {}
@@ -140,32 +245,39 @@ def load_and_assign_questions():
     # Shuffle the questions
     random.shuffle(all_questions)
 
+    import numpy as np
+    import pandas as pd
+
     # Assign one question per day
-    mapping = {}
-    days_in_year = 366 if is_leap_year(date.today().year) else 365
-    for single_date in (date.today().replace(month=1, day=1) + pd.to_timedelta(n, unit='D') for n in range(days_in_year)):
-        date_str = single_date.strftime("%Y-%m-%d")
-        # Assign question by modulo to cycle if questions < days
-        question = all_questions[(single_date.timetuple().tm_yday - 1) % len(all_questions)]
-        mapping[date_str] = question
+    year = date.today().year
+    days_in_year = 366 if calendar.isleap(year) else 365
+    dates = pd.date_range(f"{year}-01-01", periods=days_in_year).strftime("%Y-%m-%d").to_numpy()
+    # Assign question by modulo to cycle if questions < days
+    idx = np.arange(days_in_year) % len(all_questions)
+    questions_arr = np.asarray(all_questions, dtype=object)[idx]
+    mapping = dict(zip(dates, questions_arr.tolist()))
 
     # Save the mapping to a JSON file
     with open(MAPPING_FILE, 'w') as f:
-        json.dump(mapping, f, indent=4)
+        f.write(json.dumps(mapping, separators=(",", ":")))
 
     return mapping
 
-def is_leap_year(year):
-    """Check if a given year is a leap year."""
-    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+@st.cache_data(show_spinner=False)
+def read_question_mapping(mtime):
+    """
+    Parse the date-question mapping JSON file.
+    Cached by the file's mtime, so the file is only parsed again when it changes.
+    """
+    with open(MAPPING_FILE, 'r') as f:
+        return json.load(f)
 
 def load_question_mapping():
     """
     Load the date-question mapping from the JSON file.
     If the file doesn't exist, create it.
+    Only the JSON parse is cached, so the status messages below are not replayed on every rerun.
     """
-    if not os.path.exists('data'):
-        os.makedirs('data')
     if not os.path.exists(MAPPING_FILE):
         st.info("Initializing date-question mapping...")
         mapping = load_and_assign_questions()
@@ -176,16 +288,26 @@ def load_question_mapping():
         return mapping
     else:
         try:
-            with open(MAPPING_FILE, 'r') as f:
-                mapping = json.load(f)
-            return mapping
+            return read_question_mapping(os.path.getmtime(MAPPING_FILE))
         except Exception as e:
             st.error(f"Error loading date-question mapping: {e}")
             return {}
 
+@st.cache_resource(show_spinner=False)
+def build_question_df(today_str, mapping_mtime, _question_mapping):
+    """
+    Build the Question list table for dates from 1 February 2025 up to today.
+    Cached by today's date and the mapping file's mtime; the mapping itself is not hashed.
+    The table is only displayed, so it is shared rather than copied on every cache hit.
+    """
+    import pandas as pd
+    # Filter out future dates and only include dates from 1 February 2025 up to today's date.
+    filtered_items = [(d, q) for d, q in _question_mapping.items() if "2025-02-01" <= d <= today_str]
+    return pd.DataFrame(filtered_items, columns=["Date", "Daily Question"])
+
 def main():
-    # Initialize the database
-    init_db()
+    # Initialize the database (schema setup runs once, when the shared connection is created)
+    get_connection()
     
     # Ensure editing state exists in session_state
     if "editing_message_id" not in st.session_state:
@@ -193,10 +315,17 @@ def main():
     
     # Set up Streamlit page configuration
     st.set_page_config(page_title="💬 Whysapp", page_icon="💬", layout="wide")
+
+    # Feedback queued by the previous run (e.g. before a rerun)
+    show_flash()
     
     # Auto-refresh setup: Refresh every 2 seconds, limit to 100 refreshes
     #st_autorefresh(interval=2000, limit=100, key="fizzbuzzcounter")
     
+    # Resolve today's date once per rerun so every check below agrees, even around midnight
+    today = date.today()
+    today_str = today.isoformat()
+
     # Load question mapping
     question_mapping = load_question_mapping()
     
@@ -209,26 +338,18 @@ def main():
     with top_right_cols[1]:
         if st.button("Question list", key="question_list_button"):
             st.session_state.show_question_list = True
-            try:
-                # Causes an error
-                st.experimental_rerun()  # Rerun to update the UI with the selected user
-            except Exception:
-                pass  # Suppress the error
+            if RERUN:
+                RERUN()  # Rerun to update the UI with the selected user
     
     # If the user has activated the Question list view, show the full-width table with a Back button.
     if st.session_state.show_question_list:
-        # Filter out future dates and only include dates from 1 February 2025 up to today's date.
-        today_str = date.today().strftime("%Y-%m-%d")
-        filtered_items = [(d, q) for d, q in question_mapping.items() if "2025-02-01" <= d <= today_str]
-        df_questions = pd.DataFrame(filtered_items, columns=["Date", "Daily Question"])
+        mapping_mtime = os.path.getmtime(MAPPING_FILE) if os.path.exists(MAPPING_FILE) else None
+        df_questions = build_question_df(today_str, mapping_mtime, question_mapping)
         st.dataframe(df_questions, use_container_width=True, hide_index=True)
         if st.button("Back", key="back_button"):
             st.session_state.show_question_list = False
-            try:
-                # Causes an error
-                st.experimental_rerun()  # Rerun to update the UI with the selected user
-            except Exception:
-                pass  # Suppress the error
+            if RERUN:
+                RERUN()  # Rerun to update the UI with the selected user
         return
 
     # User Login / Selection
@@ -237,13 +358,8 @@ def main():
         user = st.radio("Choose your identity:", (USER_A, USER_B))
         if st.button("Enter Chat"):
             st.session_state['username'] = user
-
-        try:
-            # Causes an error
-            st.experimental_rerun()  # Rerun to update the UI with the selected user
-        except Exception:
-            pass  # Suppress the error
-            
+            if RERUN:
+                RERUN()  # Rerun to update the UI with the selected user
         return
     
     username = st.session_state['username']
@@ -251,31 +367,25 @@ def main():
     if st.sidebar.button("Switch User"):
         st.session_state['username'] = None
         
-        try:
-            # Causes an error
-            st.experimental_rerun()  # Rerun to update the UI with the selected user
-        except Exception:
-            pass  # Suppress the error
+        if RERUN:
+            RERUN()  # Rerun to update the UI with the selected user
     
     # Date Selection for Viewing Chats
     st.subheader("📅 Select Date to View Our Chats")
     selected_date = st.date_input(
         "Choose a date",
-        value=date.today(),
+        value=today,
         min_value=date(2025, 2, 1),
-        max_value=date.today()
+        max_value=today
     )
-    selected_date_str = selected_date.strftime("%Y-%m-%d")
+    selected_date_str = selected_date.isoformat()
     
     # Get the question for the selected date
     daily_question = question_mapping.get(selected_date_str, "No question available for this date.")
     
-    st.markdown(f"""
-    <div>
-        <h1 style='font-size: 35px; color: #A7FFFF;'>Question of the Day:</h1>
-        <p style='font-size: 35px; color: #A7FFFF;'>{daily_question}\n</p>
-    </div>
-""", unsafe_allow_html=True)
+    # Shared styles for the question and chat bubbles, injected once per run
+    st.markdown(CHAT_CSS, unsafe_allow_html=True)
+    st.markdown(QOTD_TEMPLATE.format(q=daily_question), unsafe_allow_html=True)
     
     # Chat Display
     st.header("🗨️ Our Conversation")
@@ -284,57 +394,64 @@ def main():
     messages = get_messages(selected_date=selected_date_str)
     
     if messages:
-        for message in messages:
-            msg_id, sender, content, timestamp = message
-            timestamp_formatted = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S').strftime('%Y-%m-%d %H:%M:%S')
+        # Bubbles are collected and emitted with a single st.markdown call; only the message
+        # being edited breaks the batch, since it needs its own input widgets.
+        html_parts = []
+        own_messages = []
+
+        def flush_html_parts():
+            if html_parts:
+                st.markdown("\n".join(html_parts), unsafe_allow_html=True)
+                html_parts.clear()
+
+        # Rows are iterated as plain tuples on purpose: own and other messages interleave, so they
+        # can't be rendered as separate column-wise groups, and a DataFrame here would put pandas
+        # on every rerun of the chat view.
+        for msg_id, sender, content, timestamp in messages:
             if sender == username:
                 # Messages sent by the current user
-                # Use two columns: one for the message (and inline edit form) and one for the buttons.
-                cols = st.columns([6, 4])
-                with cols[0]:
-                    # If this message is currently being edited, show an inline edit form.
-                    if st.session_state.editing_message_id == msg_id:
-                        new_text = st.text_input("Edit your message:", value=content, key=f"edit_input_{msg_id}")
-                        if st.button("Submit Edit", key=f"submit_edit_{msg_id}"):
-                            if new_text.strip() != "":
-                                edit_message(msg_id, username, new_text.strip())
-                                st.session_state.editing_message_id = None
-                                try:
-                                    st.experimental_rerun()  # Rerun to update the UI with the selected user
-                                except Exception:
-                                    pass  # Suppress the error
-                    else:
-                        st.markdown(f"""
-                            <div style='text-align: left; background-color: #8E4700; padding: 10px; 
-                                        border-radius: 10px; margin: 5px; display: inline-block; max-width: 100%;'>
-                                <p style='font-size: 18px; margin: 0;'>You : {content}</p>
-                            </div>
-                        """, unsafe_allow_html=True)
-                with cols[1]:
-                    # Nest two columns to have Edit and Delete buttons immediately adjacent.
-                    btn_cols = st.columns(2)
-                    with btn_cols[0]:
-                        if st.button("Edit", key=f"edit_{msg_id}"):
-                            st.session_state.editing_message_id = msg_id
-                            try:
-                                st.experimental_rerun()  # Rerun to update the UI with the selected user
-                            except Exception:
-                                pass  # Suppress the error
-                    with btn_cols[1]:
-                        if st.button("Delete", key=f"delete_{msg_id}"):
-                            delete_message(msg_id, username)
-                            try:
-                                st.experimental_rerun()  # Rerun to update the UI with the selected user
-                            except Exception:
-                                pass  # Suppress the error
+                own_messages.append((msg_id, f"#{len(own_messages) + 1} · {timestamp} — {content}"))
+                # If this message is currently being edited, show an inline edit form.
+                if st.session_state.editing_message_id == msg_id:
+                    flush_html_parts()
+                    new_text = st.text_input("Edit your message:", value=content, key=f"edit_input_{msg_id}")
+                    if st.button("Submit Edit", key=f"submit_edit_{msg_id}"):
+                        if new_text.strip() != "":
+                            edit_message(msg_id, username, new_text.strip())
+                            st.session_state.editing_message_id = None
+                            if RERUN:
+                                RERUN()  # Rerun to update the UI with the selected user
+                else:
+                    html_parts.append(OWN_BUBBLE_TMPL.format(content=content))
             else:
                 # Messages sent by the other user
-                st.markdown(f"""
-                    <div style='text-align: left; background-color: #439028; padding: 10px; 
-                                border-radius: 10px; margin: 5px; display: inline-block; max-width: 100%;'>
-                        <p style='font-size: 18px; margin: 0;'>{sender} : {content}</p>
-                    </div>
-                """, unsafe_allow_html=True)
+                html_parts.append(OTHER_BUBBLE_TMPL.format(sender=sender, content=content))
+        flush_html_parts()
+
+        # A single Edit/Delete row for the user's own messages instead of two buttons per message
+        if own_messages:
+            # Labels include position and timestamp so identical messages can be told apart
+            # (backdated messages all share the 00:00:00 timestamp)
+            own_labels = dict(own_messages)
+            action_cols = st.columns([6, 2, 2])
+            with action_cols[0]:
+                selected_msg_id = st.selectbox(
+                    "Your messages:",
+                    options=list(own_labels),
+                    index=len(own_labels) - 1,
+                    format_func=lambda msg_id: own_labels[msg_id],
+                    key="own_message_select",
+                )
+            with action_cols[1]:
+                if st.button("Edit", key="edit_message_button"):
+                    st.session_state.editing_message_id = selected_msg_id
+                    if RERUN:
+                        RERUN()  # Rerun to update the UI with the selected user
+            with action_cols[2]:
+                if st.button("Delete", key="delete_message_button"):
+                    delete_message(selected_msg_id, username)
+                    if RERUN:
+                        RERUN()  # Rerun to update the UI with the selected user
     
     else:
         st.info("No messages for the selected date.")
@@ -346,16 +463,14 @@ def main():
         submit = st.form_submit_button("Send")
         if submit and msg.strip() != "":
             # If the selected date is not today's date, send the message with the selected date's timestamp.
-            if selected_date_str != date.today().strftime("%Y-%m-%d"):
+            if selected_date_str != today_str:
                 send_message(username, msg.strip(), selected_date_str)
             else:
                 send_message(username, msg.strip())
-            st.success("Message sent!")
+            flash("success", "Message sent!")
 
-            try:
-                st.experimental_rerun()  # Rerun to update the UI with the selected user
-            except Exception:
-                pass  # Suppress the error
+            if RERUN:
+                RERUN()  # Rerun to update the UI with the selected user
             # Auto-refresh will handle updating the messages display
             
 